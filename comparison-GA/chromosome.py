@@ -20,30 +20,50 @@ import random
 import numpy
 
 class Chromosome:
-    def __init__(self, rep, vector):
+    def __init__(self, rep, vector, length=None):
         """
         vector -- sequence of bitstrings or a sequence of real numbers (will implicitly convert to bitstrings)
                   note: the sequence of bitstrings will be a string (e.g. "0110101010") where vector entries can be
-                  distinguished by knowing the number of bits to encode a real number in the interval. A 
-                  sequence of real numbers will be a list of real numbers in the interval, which will be converted 
-                  to a bitstring.
+                  distinguished by knowing the number of bits to encode a real number in the interval. A
+                  sequence of real numbers will be a list of real numbers in the interval, which will be converted
+                  to a bitstring. A bit-packed int is also accepted, in which case length gives its
+                  bit length (leading zeros carry no width information).
         rep -- representation function to be used (Representation object)
         """
         self._b = rep.num_bits()   # number of bits to encode a single real number
         self._rep = rep
-        self._vec = ""
 
         if type(vector) == list or type(vector) == tuple:
-            for n in vector:
-                self._vec += self._rep.to_bitstr(n)
+            vector = ''.join(self._rep.to_bitstr(n) for n in vector)
+
+        # the genotype is bit-packed into a single python int (MSB first, so
+        # bit sequence index i is int bit _len-1-i); the genetic operators
+        # are then plain ALU ops instead of per-bit loops
+        if isinstance(vector, str):
+            self._len = len(vector)
+            self._vec = int(vector, 2)
         else:
+            assert length is not None, "int genotype needs an explicit bit length"
+            self._len = length
             self._vec = vector
 
+    def _chunk(self, i):
+        """
+        the integer value of the ith bitstring of the sequence
+        """
+        return (self._vec >> (self._len - (i+1)*self._b)) & ((1 << self._b) - 1)
+
+    def _chunk_str(self, i):
+        """
+        the ith bitstring of the sequence, as a string for the representation interface
+        """
+        return format(self._chunk(i), '0' + str(self._b) + 'b')
+
     def to_real_vec(self):
         """
         converts bitstring sequence to a real-valued vector
         """
-        return [self._rep.to_num(self._vec[i:i+self._b]) for i in range(0, len(self._vec), self._b)]
+        return [self._rep.to_num(self._chunk_str(i)) for i in range(self._len // self._b)]
 
     def eval_fitness(self, fn):
         """
@@ -60,26 +80,31 @@ class Chromosome:
                   individual bitstring length and representation function as self.
         """
         if string is None:
-            string = self._vec
+            vec, nbits = self._vec, self._len
+        else:
+            vec, nbits = int(string, 2), len(string)
 
-        for i in range(0, len(string), self._b):
-            if not self._rep.is_valid(string[i:i+self._b]):
-                return False
-        return True
+        # slice each bitstring's integer value out of the packed genotype and
+        # check membership in the representation's memoized set of valid codes
+        valid = self._rep.valid_codes()
+        mask = (1 << self._b) - 1
+        return all((vec >> shift) & mask in valid
+                   for shift in range(0, nbits, self._b))
 
     def crossover(self, partner):
         """
         Returns two child chromosomes created from self and a partner chromosome.
         The technique used here is one point crossover.
         """
-        p1, p2 = str(self), str(partner)
-        assert(len(p1) == len(p2))
-        point = random.randint(0,len(p1))
-        child1 = p1[:point] + p2[point:]
-        child2 = p2[:point] + p1[point:]
-        assert(len(child1) == len(p1))
-        assert(len(child2) == len(p1))
-        return [Chromosome(self._rep, child1), Chromosome(self._rep, child2)]
+        p1, p2 = self._vec, partner._vec
+        L = self._len
+        assert(L == partner._len)
+        point = random.randint(0,L)
+        # bits below the cut (the string's tail) come from the other parent
+        lowmask = (1 << (L - point)) - 1
+        child1 = (p1 & ~lowmask) | (p2 & lowmask)
+        child2 = (p2 & ~lowmask) | (p1 & lowmask)
+        return [Chromosome(self._rep, child1, L), Chromosome(self._rep, child2, L)]
 
 
     def mutate(self, pm):
@@ -87,17 +112,11 @@ class Chromosome:
         multi-bit mutation. Called after mutation rate check is made.
         returns new mutated chromosome. pm = mutation rate
         """
-        flip = lambda b : "0" if b == "1" else "1"
-        l = len(self._vec)
-        mutindiv = []
-        for i in range(l):
-            if random.uniform(0,1) <= pm:
-                mutindiv.append(flip(self._vec[i]))
-            else:
-                mutindiv.append(self._vec[i])
-#        if ''.join(mutindiv) == self._vec:
-#            return self
-        return Chromosome(self._rep, ''.join(mutindiv))
+        # pack the bernoulli draws into a flip mask int (padded on the right
+        # by packbits, so shift the padding back out)
+        flips = numpy.packbits(numpy.random.random(self._len) <= pm)
+        mask = int.from_bytes(flips.tobytes(), 'big') >> (-self._len % 8)
+        return Chromosome(self._rep, self._vec ^ mask, self._len)
 
 
 
@@ -114,10 +133,10 @@ class Chromosome:
         """
         returns a copy of itself as a new object
         """
-        return Chromosome(self._rep, self._vec)
+        return Chromosome(self._rep, self._vec, self._len)
 
     def __str__(self):
-        return self._vec
+        return format(self._vec, '0' + str(self._len) + 'b')
 
 
 
@@ -150,24 +169,12 @@ def tournament_selection(pop, k, fmap, key):
     """
     assert (0 < k and k <= len(pop)), "invalid tournament size"
 
-    ksubset = []
-    popcopy = pop[:]
-    for i in range(k):
-        ind = random.randint(0,len(popcopy)-1) 
-        chrom = popcopy[ind]
-        ksubset.append(chrom)
-        popcopy.pop(ind) 
-
-    assert len(ksubset) == k, "tournament size not met"
-
-    most_fit = ksubset[0]
-    for chrom in ksubset:
-        david = fmap[chrom]
-        goliath = fmap[most_fit] 
-        if key(david, goliath) == david:
-            most_fit = chrom 
+    # O(k) sample of distinct indices -- no population copy, no list pops
+    ksubset = [pop[i] for i in random.sample(range(len(pop)), k)]
 
-    return most_fit 
+    if key == min:
+        return min(ksubset, key=fmap.get)
+    return max(ksubset, key=fmap.get)
 
 def key_with_fittest_val_dict(d, key):
     """
@@ -176,6 +183,11 @@ def key_with_fittest_val_dict(d, key):
     d -- the dictionary
     key -- min or max
     """
+    # fast path for the two keys ever passed: one C-level scan instead of a
+    # Python comparison per entry. Iterating reversed keeps the old
+    # behavior of ties going to the latest key.
+    if key is min or key is max:
+        return key(reversed(list(d)), key=d.get)
     opt = None
     for k, v in d.items():
         if opt is None or key(d[k], d[opt]) == d[k]:
@@ -8,8 +8,9 @@ Accordingly, this program optimizes a function using GAs and plots the Fitness v
 
 import testFunctions as tf
 import representation as rp
-import multiprocessing as mp
-from pathos.multiprocessing import ProcessingPool as Pool
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import freeze_support
 from optimizationGA import GA_SEARCH
 
 # Global constants
@@ -33,39 +34,50 @@ g = 100 # no. of generations. Doesnt actually do anything because we run the GA
 NUM_RUNS = 1000
 # minimization
 key = min
+
+FUNCS = [tf.f1, tf.f2, tf.f3, tf.f4, tf.f5]
+RANGES = [(-5.12,5.11,0.01), (-2.048,2.047,0.001), (-5.12,5.11,0.01), (-1.28, 1.27, 0.01), (-65.536, 65.535, 0.001)]
+CODES = {"NGG": NGG_CODE, "UBL": UBL_CODE, "BRG": GRAY_CODE, "BIN": BINARY_CODE}
+
+
+def _run_one(job):
+    """
+    Top-level worker for the process pool: runs one GA trial. The job only
+    carries primitives (the test functions hold lambdas, which don't pickle),
+    so the worker resolves them from the module tables above.
+    """
+    seed, codename, j, i = job
+    file = "f" + str(j) + "_" + codename + "_T" + str(i)
+    GA_SEARCH(m, c, p, g, CODES[codename], file, FUNCS[j-1], RANGES[j-1], key, seed=seed)
+
+
 def main():
-    # 5 trials
     # writes online performance to text file function_representation_trial#.txt
 
     # endpoint in interval must be end - step to make sure the number of discrete points on each axis is a power of 2
             # e.g. is literature says the search space is -5.12 <= x <= 5.12 with resolution \delta x = 0.01, input
             #       (-5.12, 5.11, 0.01) as the interval
 
+    # create the output directories once here, before dispatching workers, so
+    # no trial races another on mkdir or dies on a missing directory
+    os.makedirs("results", exist_ok=True)
+    os.makedirs("graphs", exist_ok=True)
 
-    pool = Pool(mp.cpu_count())
+    # every trial is an independent, CPU-bound GA run, so they are farmed out
+    # to one process per core. Each job gets its own seed for reproducibility.
     jobs = []
+    seed = 0
+    for j in range(1, len(FUNCS)+1):
+        print(str(FUNCS[j-1]))
+        for i in range(1, NUM_RUNS+1):
+            for codename in CODES:
+                jobs.append((seed, codename, j, i))
+                seed += 1
 
-    funcs = [tf.f1, tf.f2, tf.f3, tf.f4, tf.f5]
-    ranges = [(-5.12,5.11,0.01), (-2.048,2.047,0.001), (-5.12,5.11,0.01), (-1.28, 1.27, 0.01), (-65.536, 65.535, 0.001)]
-    search = lambda i,j : GA_SEARCH(m, c, p, g, GRAY_CODE, "f" + str(j) + "_BRG_T" + str(i), funcs[j-1], ranges[j-1], min)
-
-    for j in range(1, len(funcs)+1):
-        print(str(funcs[j-1]))
-        for i in range(1,NUM_RUNS+1):
-            job = pool.apipe(GA_SEARCH, m, c, p, g, NGG_CODE, "f" + str(j) + "_NGG_T" + str(i), funcs[j-1], ranges[j-1], min)
-            jobs.append(job)
-            job = pool.apipe(GA_SEARCH, m, c, p, g, UBL_CODE, "f" + str(j) + "_UBL_T" + str(i), funcs[j-1], ranges[j-1], min)
-            jobs.append(job)
-
-            job = pool.apipe(GA_SEARCH, m, c, p, g, GRAY_CODE, "f" + str(j) + "_BRG_T" + str(i), funcs[j-1], ranges[j-1], min)
-            jobs.append(job)
-            job = pool.apipe(GA_SEARCH, m, c, p, g, BINARY_CODE, "f" + str(j) + "_BIN_T" + str(i), funcs[j-1], ranges[j-1], min)
-            jobs.append(job)
-
-    for job in jobs:
-        job.get()
-#    pool.close()
-#    pool.join()
+    with ProcessPoolExecutor(os.cpu_count()) as pool:
+        # consume the iterator so worker exceptions surface here
+        list(pool.map(_run_one, jobs, chunksize=8))
 
 if __name__ == "__main__":
+    freeze_support()
     main()
@@ -8,7 +8,29 @@ from chromosome import *
 import os
 import math
 
-def GA_SEARCH(mutrate, crossrate, popsize, gens, rep, file, fn, interval, key=min):
+
+def pack_population(bits):
+    """
+    packs a (n, L) uint8 bit matrix into (n, ceil(L/64)) uint64 words,
+    MSB-first with zero padding on the right, so row-wise genetic operators
+    run 64 bit-lanes per ALU op
+    """
+    n, L = bits.shape
+    pad = (-L) % 64
+    if pad:
+        bits = numpy.concatenate((bits, numpy.zeros((n, pad), dtype=numpy.uint8)), axis=1)
+    return numpy.packbits(bits, axis=1).view(numpy.dtype('>u8')).astype(numpy.uint64)
+
+
+def unpack_population(pop, L):
+    """
+    inverse of pack_population: (n, words) uint64 back to a (n, L) uint8
+    bit matrix
+    """
+    asbytes = pop.astype(numpy.dtype('>u8')).view(numpy.uint8)
+    return numpy.unpackbits(asbytes.reshape(len(pop), -1), axis=1)[:, :L]
+
+def GA_SEARCH(mutrate, crossrate, popsize, gens, rep, file, fn, interval, key=min, seed=None):
     """
     Executes a genetic algorithm to optimize a mathematical function fn. Returns a pair (X,y) where X is an input vector and y is the optimized fn(X)
     mutrate -- mutation rate, between 0 and 1 inclusive
@@ -24,9 +46,15 @@ def GA_SEARCH(mutrate, crossrate, popsize, gens, rep, file, fn, interval, key=mi
                 is constrained by x_i \in [start,end] with step increments. Make sure fn is continuous along every point in the interval (e.g. no ZeroDivisionErrors).
     W -- scaling window = 1
     S -- selection strategy = E  
-    key -- min for function minimization and max for function maximization 
+    key -- min for function minimization and max for function maximization
+    seed -- optional RNG seed, so trials farmed out to worker processes are
+            reproducible and decorrelated
     """
 
+    # one PCG64 generator per trial; every random draw in the loop comes from
+    # it in bulk instead of per-call dispatches into the random module
+    rng = numpy.random.default_rng(seed)
+
     assert popsize > 0, "popsize is not positive"
     assert 0 <= mutrate and mutrate <= 1, "invalid mutation rate"
     assert 0 <= crossrate and crossrate <= 1, "invalid crossover rate"
@@ -34,105 +62,117 @@ def GA_SEARCH(mutrate, crossrate, popsize, gens, rep, file, fn, interval, key=mi
 
 #    print("Initializing...")
 
-    # Initialize representation 
+    # Initialize representation
     REP = rep(interval)
 
 #    print(key.__name__.upper() + "IMIZING " + str(fn).upper() + " (" + REP.get_name() + ")")
 
 
-    f = open(os.path.join("results", file + ".txt"), 'w')
-    g = open(os.path.join("results", file + "best_sol" + ".txt"), 'w')
+    # per-eval and per-generation fitness logs, buffered in memory and
+    # written in one shot at the end instead of a tiny write per eval
+    eval_log = []
+    best_log = []
 
-    # Initialize random population
+    # Initialize random population as a bit matrix: row i holds the dim*b
+    # genotype bits of individual i, so selection, crossover and mutation
+    # are whole-array numpy ops instead of per-chromosome object churn
     EVAL_LIMIT = 5000
     EVALS = 0
     curr_gen = 1
-    POP = []
     dim = fn.get_input_dimension()
+    b = REP.num_bits()
+    L = dim*b
 
-    for i in range(0, popsize):
-        vec = ""
-        for n in range(dim):
-            vec += REP.get_random_bitstr()
-        chrom = Chromosome(REP, vec)
-        POP.append(chrom)
-
+    # the encodings are dense over all b-bit strings, so uniform random bits
+    # are exactly a uniform draw over valid genotypes
+    POP = pack_population(rng.integers(0, 2, (popsize, L), dtype=numpy.uint8))
 
     assert len(POP) == popsize, "POP has incorrect number of elements"
 
-
-    # evaluate population 
+    # one-point crossover masks for every cut point, packed once: row c has
+    # the first c bits set. Row L (all ones) doubles as the "no crossover,
+    # clone parent" mask.
+    XMASKS = pack_population((numpy.arange(L) < numpy.arange(L + 1)[:, None]).astype(numpy.uint8))
+
+    def evaluate(pop):
+        """
+        Evaluates every row of a packed population, returning the fitness
+        array aligned with the rows -- no dict keyed by genotype, so finding
+        the best individual is an argmin. Fitness is not performance value.
+        It is just the evaluation of the objective function to be minimized.
+        """
+        return fn.batch(REP.to_num_batch(unpack_population(pop, L)))
+
+    # specialize the min/max dispatch once at entry instead of re-testing
+    # key on every use in the generation loop
+    minimize = key is min
+    argbest = numpy.argmin if minimize else numpy.argmax
+    bestval = numpy.min if minimize else numpy.max
+    worstval = numpy.max if minimize else numpy.min
+
+    # evaluate population
 #    print("Evolving...")
-    # Fitness map is not performance value. It is just the evaluation of the objective function to be minimized.
-    FITNESS_MAP = {chrom:chrom.eval_fitness(fn) for chrom in POP}
+    FITNESS = evaluate(POP)
 
     # scaling window of 1
-    if key == min:
-        best = math.inf
-        f_prime = max(FITNESS_MAP.values())
-    else:
-        best = -math.inf
-        f_prime = min(FITNESS_MAP.values())
-
-    for k in POP:
-        # f.write(str(k.performance_value(FITNESS_MAP, f_prime, key)))
-        # f.write("\t")
-        f.write(str(FITNESS_MAP[k]))
-        f.write("\n")
+    f_prime = worstval(FITNESS)
+
+    for v in FITNESS.tolist():
+        eval_log.append(v)
         EVALS += 1
 
-    g.write(str(key(FITNESS_MAP.values())) + "\n")
+    best_log.append(bestval(FITNESS))
     # Evolve
     while EVALS < EVAL_LIMIT:
         curr_gen += 1
-        child_POP = []
-        new_children = []  # new individuals not from previous generation. Child_pop is the entire population that will replace POP.
-                            # new_children keeps track of the individuals that are not from previous generation
-        for i in range(popsize//2):
-            parent1, parent2 = wheel_selection(POP, FITNESS_MAP, f_prime, key)
-
-            if random.uniform(0,1) <= crossrate:
-                child1, child2 = parent1.crossover(parent2)
-            else:
-                child1, child2 = parent1, parent2
-
-            child1 = child1.mutate(mutrate)
-            child2 = child2.mutate(mutrate)
-
-            if child1 != parent1 and child1 != parent2:
-                new_children.append(child1)
-            if child2 != parent1 and child2 != parent2:
-                new_children.append(child2)
 
-
-            child_POP.append(child1)
-            child_POP.append(child2)
-
-        # elitist replacement
-        best_chrom = key(FITNESS_MAP, key = FITNESS_MAP.get)
-        if best_chrom not in child_POP:
-            child_POP.append(best_chrom)
-
-        POP = child_POP.copy()
+        # fitness-proportional (wheel) selection of all parent pairs at once,
+        # weighted by performance value u(x) under the scaling window
+        w = f_prime - FITNESS if minimize else FITNESS - f_prime
+        s = w.sum()
+        pairs = popsize//2
+        parents = rng.choice(len(POP), size=(pairs, 2),
+                             p=None if s == 0 else w/s)
+        P1 = POP[parents[:, 0]]
+        P2 = POP[parents[:, 1]]
+
+        # one point crossover for the pairs that pass the crossover-rate draw:
+        # bits before the cut come from one parent, the rest from the other,
+        # via the packed cut-point masks. Pairs that skip crossover use the
+        # all-ones mask, i.e. clone the parents.
+        xpts = rng.integers(0, L + 1, pairs)
+        skip = rng.random(pairs) > crossrate
+        mask = XMASKS[numpy.where(skip, L, xpts)]
+        CHILDREN = numpy.empty((2*pairs, POP.shape[1]), dtype=numpy.uint64)
+        CHILDREN[0::2] = (P1 & mask) | (P2 & ~mask)
+        CHILDREN[1::2] = (P2 & mask) | (P1 & ~mask)
+
+        # multi-bit mutation as one XOR flip mask over the child words
+        CHILDREN ^= pack_population((rng.random((2*pairs, L)) <= mutrate).astype(numpy.uint8))
+
+        # elitist replacement: the previous generation's best row survives
+        best_row = POP[argbest(FITNESS)]
+        POP = numpy.vstack((CHILDREN, best_row[None, :]))
 
         assert len(POP) == popsize or len(POP) == popsize + 1, "popsize not maintained after next generation"
-        FITNESS_MAP = {chrom:chrom.eval_fitness(fn) for chrom in POP}
+        FITNESS = evaluate(POP)
 
         # scaling window of 1, so recompute f_prime every generation
-        if key == min:
-            f_prime = max(FITNESS_MAP.values())
-        else:
-            f_prime = min(FITNESS_MAP.values())
-
-        for new in new_children:
-            # f.write(str(new.performance_value(FITNESS_MAP, f_prime, key)))
-            # f.write("\t")
-            f.write(str(FITNESS_MAP[new]))
-            f.write("\n")
+        f_prime = worstval(FITNESS)
+
+        for v in FITNESS[:len(CHILDREN)].tolist():
+            eval_log.append(v)
             EVALS += 1
             if EVALS == EVAL_LIMIT:
-                break 
+                break
+
+        best_log.append(bestval(FITNESS))
 
-        g.write(str(key(FITNESS_MAP.values())) + "\n")
+    with open(os.path.join("results", file + ".txt"), 'w') as f:
+        f.write('\n'.join(str(v) for v in eval_log))
+        f.write('\n')
+    with open(os.path.join("results", file + "best_sol" + ".txt"), 'w') as g:
+        g.write('\n'.join(str(v) for v in best_log))
+        g.write('\n')
 
 #    print("All " + str(EVALS) + " fitness evals completed")
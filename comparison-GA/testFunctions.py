@@ -7,19 +7,23 @@ A Test function interface
 """
 import math
 import random
+import numpy
 
 class TestFn:
     """
     encapsulates all data needed to interact with a given test function for GA optimization
 
     name -- a string description of the function (e.g. "Parabola with noise")
-    formula -- a real valued function that is scalar valued in its output and vector valued in its input   
+    formula -- a real valued function that is scalar valued in its output and vector valued in its input
     dim -- dimension of the input space R^dim
+    batch_formula -- optional vectorized form of formula that maps a whole
+                     (pop, dim) array to the (pop,) vector of outputs
     """
-    def __init__(self, name, formula, dimension):
+    def __init__(self, name, formula, dimension, batch_formula=None):
         self._name = name
-        self._f = formula 
+        self._f = formula
         self._n = dimension
+        self._fbatch = batch_formula
 
     def eval(self, vector):
         """
@@ -29,6 +33,19 @@ class TestFn:
             raise ValueError("Input dimensions don't match")
         return self._f(vector)
 
+    def batch(self, X):
+        """
+        evaluates the function on a (pop, dim) array of input vectors at once,
+        returning the (pop,) fitness vector. Falls back to a Python loop over
+        the rows when no vectorized formula was given.
+        """
+        X = numpy.asarray(X, dtype=numpy.float64)
+        if X.shape[1] != self._n:
+            raise ValueError("Input dimensions don't match")
+        if self._fbatch is not None:
+            return numpy.asarray(self._fbatch(X), dtype=numpy.float64)
+        return numpy.array([self._f(list(row)) for row in X])
+
     def get_input_dimension(self):
         return self._n
 
@@ -42,19 +59,24 @@ class TestFn:
 
 
 # Rosenbrock's saddle function in 2 dimensions
-f2 = TestFn("Rosenbrock's Saddle", lambda X: ((1-X[0])**2)+100*((X[0]**2)-X[1])**2, dimension=2)
+f2 = TestFn("Rosenbrock's Saddle", lambda X: ((1-X[0])**2)+100*((X[0]**2)-X[1])**2, dimension=2,
+            batch_formula=lambda X: ((1-X[:,0])**2)+100*((X[:,0]**2)-X[:,1])**2)
 
 # Beale's function in 2 dimensions
-BEALEf = TestFn("Beale function", lambda X: ((1.5-X[0]+X[0]*X[1])**2) + ((2.25-X[0]+X[0]*X[1]**2)**2) + ((2.625-X[0]+X[0]*X[1]**3)**2), dimension=2)
+BEALEf = TestFn("Beale function", lambda X: ((1.5-X[0]+X[0]*X[1])**2) + ((2.25-X[0]+X[0]*X[1]**2)**2) + ((2.625-X[0]+X[0]*X[1]**3)**2), dimension=2,
+                batch_formula=lambda X: ((1.5-X[:,0]+X[:,0]*X[:,1])**2) + ((2.25-X[:,0]+X[:,0]*X[:,1]**2)**2) + ((2.625-X[:,0]+X[:,0]*X[:,1]**3)**2))
 
 # Parabola in 3 dimensions
-f1 = TestFn("Parabola", lambda X: sum([x_i**2 for x_i in X]), dimension=3)
+f1 = TestFn("Parabola", lambda X: sum([x_i**2 for x_i in X]), dimension=3,
+            batch_formula=lambda X: (X**2).sum(axis=1))
 
 # Step function in 5 dimensions
-f3 = TestFn("Step function", lambda X: sum([math.floor(X[i]) for i in range(len(X))]), dimension=5)
+f3 = TestFn("Step function", lambda X: sum([math.floor(X[i]) for i in range(len(X))]), dimension=5,
+            batch_formula=lambda X: numpy.floor(X).sum(axis=1))
 
 # Quartic with noise in 30 dimensions
-f4 = TestFn("Quartic with noise", lambda X: sum([i*(X[i]**4) for i in range(len(X))]) + random.gauss(mu=0,sigma=1), dimension=30)
+f4 = TestFn("Quartic with noise", lambda X: sum([i*(X[i]**4) for i in range(len(X))]) + random.gauss(mu=0,sigma=1), dimension=30,
+            batch_formula=lambda X: (numpy.arange(30)*(X**4)).sum(axis=1) + numpy.random.normal(0.0, 1.0, len(X)))
 
 # Shekel's foxholes in 2 dimension
 def shekel(X):
@@ -63,8 +85,17 @@ def shekel(X):
     A = [A_1, A_2]
     return 1/((1/500) + sum([1/(j+sum([(X[i]-A[i][j-1])**6 for i in range(0,len(X))])) for j in range(1,26)]))
 
-f5 = TestFn("Shekel's Foxholes", shekel, dimension=2)
+_SHEKEL_A = numpy.array([[-32, -16, 0, 16, 32]*5,
+                         [-32]*5 + [-16]*5 + [0]*5 + [16]*5 + [32]*5], dtype=numpy.float64)
+
+def shekel_batch(X):
+    # broadcast all 25 foxholes against all rows at once: (pop, 2, 25) -> (pop, 25)
+    d = ((X[:, :, None] - _SHEKEL_A[None, :, :])**6).sum(axis=1)
+    return 1/((1/500) + (1/(numpy.arange(1, 26) + d)).sum(axis=1))
+
+f5 = TestFn("Shekel's Foxholes", shekel, dimension=2, batch_formula=shekel_batch)
 
 # Easom function in 2 dimensions
 
-EASOM = TestFn("Easom function", lambda X: -math.cos(X[0])*math.cos(X[1])*math.exp(-1*(X[0]-math.pi)**2 - (X[1]-math.pi)**2), dimension=2)
\ No newline at end of file
+EASOM = TestFn("Easom function", lambda X: -math.cos(X[0])*math.cos(X[1])*math.exp(-1*(X[0]-math.pi)**2 - (X[1]-math.pi)**2), dimension=2,
+               batch_formula=lambda X: -numpy.cos(X[:,0])*numpy.cos(X[:,1])*numpy.exp(-1*(X[:,0]-math.pi)**2 - (X[:,1]-math.pi)**2))
\ No newline at end of file
@@ -1,129 +1,145 @@
-import networkx as nx
-import representation as rp
-import pickle
-import numpy as np
-from sympy.combinatorics.graycode import GrayCode 
-
-
-"""
-Generates Non greedy gray code using hamiltonian cycles on the hypercube
-"""
-
-def hamilton(G, start):
-    """
-    from https://gist.github.com/mikkelam/ab7966e7ab1c441f947b
-    """
-    F = [(G,[start])]
-    n = G.number_of_nodes()
-    while F:
-        graph,path = F.pop()
-        confs = []
-        for node in graph.neighbors(path[-1]):
-            conf_p = path[:]
-            conf_p.append(node)
-            conf_g = nx.Graph(graph)
-            conf_g.remove_node(path[-1])
-            confs.append((conf_g,conf_p))
-        for g,p in confs:
-            if len(p)==n:
-                return p
-            else:
-                F.append((g,p))
-    return None
-
-
-
-def computeSingleBitLocality(rep):
-    """
-    compute and returns the single bit locality l_r for a given representation function rep.
-    """
-    rep = rep.get_rep()
-    strSum = 0
-    for bitString in list(rep.keys()):
-        bitSum = 0
-        b = len(bitString)
-        for pos in range(b):
-            mutatedBS = list(bitString)
-            if bitString[pos] == "1":
-                mutatedBS[pos] = "0"
-            else:
-                mutatedBS[pos] = "1"
-            mutatedBS = ''.join(mutatedBS)
-            bitSum += abs(rep[mutatedBS] - rep[bitString])
-        strSum+=bitSum
-    return strSum/((2**b)*b)
-
-def generateNonGreedyGray(bits=5):
-    assert bits >= 3, "ngg only exists for l >= 3"
-    g  = nx.hypercube_graph(bits)
-    l = bits - 3
-    zero = tuple([0]*l)+(0,0,0)
-    one = tuple([0]*l)+(0,0,1)
-    two = tuple([0]*l)+(0,1,1)
-    three = tuple([0]*l)+(1,1,1)
-    g.remove_node(zero)
-    g.remove_node(one)
-    g.remove_node(two)
-    g.remove_node(three)
-    cycle = [zero, one, two, three] + hamilton(g, tuple([0]*l) + (1,0,1))
-
-    stringifiedCycle = []
-
-    for node in cycle:
-        string = ''
-        for coord in node:
-            string += str(coord)
-        stringifiedCycle.append(string)
-
-    repfn = {stringifiedCycle[i] : i for i in range(len(stringifiedCycle))}
-    nongreedy = rp.Representation(repfn, "Non Greedy Gray " + str(bits) + "-bits")
-    return nongreedy
-
-
-
-def recursive_gray(prev_gray):
-    """
-    prev_gray : list of b-1 bit gray codes
-    """
-    L = ["0" + bitstr for bitstr in prev_gray]
-    R = prev_gray.copy()
-    R.reverse()
-    R = ["1" + bitstr for bitstr in R]
-    return L + R
-
-
-def nongreedygray_recursive(bits):
-    """
-    Generates NGG for high bit numbers, when hamiltonian path search is too slow
-    """
-    if bits == 3:
-        ngg3 = generateNonGreedyGray(3)
-        return list(ngg3.get_rep().keys())
-    else:
-        return recursive_gray(nongreedygray_recursive(bits-1))
-
-
-# with open("NGG_8.txt", "wb") as f:
-#     pickle.dump(nongreedygray_recursive(8), f)
-
-# with open("NGG_10.txt", "wb") as f:
-#     pickle.dump(nongreedygray_recursive(10), f)
-
-# with open("NGG_12.txt", "wb") as f:
-#     pickle.dump(nongreedygray_recursive(12), f)
-
-# with open("NGG_17.txt", "wb") as f:
-#     pickle.dump(nongreedygray_recursive(17), f)
-
-
-
-
-
-# b = 8
-# ngg_rep = generateNonGreedyGray(b)
-# l_r = computeSingleBitLocality(ngg_rep)
-# print(l_r, ((2**b)-1)/b)
-# if l_r > ((2**b)-1)/b:
-#     with open("NGG_" + str(b) + ".txt", 'wb') as f:
-#         pickle.dump(list(ngg.get_rep().keys()), f)
+import representation as rp
+import pickle
+import numpy as np
+
+
+"""
+Generates Non greedy gray code using hamiltonian cycles on the hypercube
+"""
+
+def hypercubeAdjacency(bits):
+    """
+    static adjacency table for the bits-cube: row v lists the vertex ids of
+    the hamming-1 neighbors of v. Built once per call instead of
+    constructing (and walking) an nx.hypercube_graph.
+
+    Rows are ordered as the raised clear bits (ascending) followed by the
+    cleared set bits (ascending). That is the reverse of the adjacency
+    order nx.hypercube_graph used to yield, which is exactly the order the
+    stack-based search below must try them in to retrace the original
+    (LIFO) traversal and emit the same hamiltonian path.
+    """
+    N = 1 << bits
+    adj = np.empty((N, bits), dtype=np.int32)
+    for v in range(N):
+        ups = [v | (1 << k) for k in range(bits) if not (v >> k) & 1]
+        downs = [v ^ (1 << k) for k in range(bits) if (v >> k) & 1]
+        adj[v] = ups + downs
+    return adj
+
+
+def hamilton(n, start, excluded=0):
+    """
+    Iterative backtracking search for a hamiltonian path on the n-cube.
+    Vertices are ints 0..2^n-1 (bit k of the id is coordinate k), so the
+    neighborhood is a static adjacency table and the set of used vertices
+    is a single bitmask -- no graph copies per expansion.
+
+    excluded -- bitmask of vertices to leave out of the search
+    Returns the path as a list of ints, or None if none exists.
+    """
+    adj = hypercubeAdjacency(n)
+    visited = excluded | (1 << start)
+    remaining = (1 << n) - bin(excluded).count("1")
+    path = [start]
+    nextbit = [0]  # per-depth index of the next neighbor bit to try
+    while path:
+        if len(path) == remaining:
+            return path
+        v = path[-1]
+        k = nextbit[-1]
+        if k < n:
+            nextbit[-1] += 1
+            u = int(adj[v, k])
+            if not (visited >> u) & 1:
+                visited |= 1 << u
+                path.append(u)
+                nextbit.append(0)
+        else:
+            # dead end: unmark and backtrack
+            visited ^= 1 << v
+            path.pop()
+            nextbit.pop()
+    return None
+
+
+
+def computeSingleBitLocality(rep):
+    """
+    compute and returns the single bit locality l_r for a given representation function rep.
+    """
+    rep = rep.get_rep()
+    b = len(next(iter(rep)))
+    N = 2**b
+    # phenotype numbers ordered by the integer value of the bitstring, so the
+    # single-bit mutation of entry i at position k is entry i^(1<<k)
+    nums_by_int = np.empty(N)
+    for k, v in rep.items():
+        nums_by_int[int(k, 2)] = v
+    idx = np.arange(N)
+    strSum = sum(np.abs(nums_by_int - nums_by_int[idx ^ (1 << k)]).sum() for k in range(b))
+    return strSum/((2**b)*b)
+
+def generateNonGreedyGray(bits=5):
+    assert bits >= 3, "ngg only exists for l >= 3"
+    zero = 0b000
+    one = 0b001
+    two = 0b011
+    three = 0b111
+    excluded = (1 << zero) | (1 << one) | (1 << two) | (1 << three)
+    cycle = [zero, one, two, three] + hamilton(bits, 0b101, excluded)
+
+    stringifiedCycle = [format(v, '0' + str(bits) + 'b') for v in cycle]
+
+    repfn = {stringifiedCycle[i] : i for i in range(len(stringifiedCycle))}
+    nongreedy = rp.Representation(repfn, "Non Greedy Gray " + str(bits) + "-bits")
+    return nongreedy
+
+
+
+def recursive_gray(prev_gray, bits):
+    """
+    prev_gray : uint32 array of (bits-1)-bit gray codes as ints
+    returns the bits-bit reflected extension: prev_gray (0-prefixed, i.e.
+    unchanged) followed by prev_gray reversed with the new top bit set
+    """
+    return np.concatenate((prev_gray, prev_gray[::-1] | np.uint32(1 << (bits - 1))))
+
+
+def nongreedygray_recursive(bits):
+    """
+    Generates NGG for high bit numbers, when hamiltonian path search is too slow.
+    The reflection is done on a single uint32 array with bitwise ops;
+    bitstrings are only formatted at the end.
+    """
+    codes = np.array([int(k, 2) for k in generateNonGreedyGray(3).get_rep().keys()],
+                     dtype=np.uint32)
+    for b in range(4, bits + 1):
+        codes = recursive_gray(codes, b)
+    return [format(int(v), '0' + str(bits) + 'b') for v in codes]
+
+
+# with open("NGG_8.txt", "wb") as f:
+#     pickle.dump(nongreedygray_recursive(8), f)
+
+# with open("NGG_10.txt", "wb") as f:
+#     pickle.dump(nongreedygray_recursive(10), f)
+
+# with open("NGG_12.txt", "wb") as f:
+#     pickle.dump(nongreedygray_recursive(12), f)
+
+# with open("NGG_17.txt", "wb") as f:
+#     pickle.dump(nongreedygray_recursive(17), f)
+
+
+
+
+
+# b = 8
+# ngg_rep = generateNonGreedyGray(b)
+# l_r = computeSingleBitLocality(ngg_rep)
+# print(l_r, ((2**b)-1)/b)
+# if l_r > ((2**b)-1)/b:
+#     with open("NGG_" + str(b) + ".txt", 'wb') as f:
+#         pickle.dump(list(ngg.get_rep().keys()), f)
 # [0, 1, 19, 2, 31, 28, 20, 3, 23,26, 24, 25, 22, 27, 21, 4, 13, 14, 18, 15, 30, 29, 17, 16,12, 9, 11, 10,7, 8, 6, 5
\ No newline at end of file
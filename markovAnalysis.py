@@ -1,168 +1,241 @@
-"""
-A Theoretical Markov chain model of the Simulated Annealing experiment.
-Doesn't simulate the chain -- it computes theoretical long term probabilities of finding the global maxima
-with temperature and non-temperature versions of the SA.
-"""
-
-
-"""
-Long term Markov chain probability
-"""
-
-import numpy as np
-from representation import *
-import math
-import random
-
-def buildTmat(rep, a):
-    """
-    generates a numpy array (transition matrix) for 
-    representtation rep and given a value. The nature of this MC
-    is that a is an absorbing state. 
-
-    This is without temperature
-
-    returns the Transition matrix P and the index g of the global maxima
-    Returns [P,g]
-    """
-    assert(a < 2**rep.num_bits())
-    states = list(rep.get_rep().keys())
-    xmax = 2**rep.num_bits() -1
-    f = [xmax - abs(x - a) for x in range(0,xmax+1)]
-    getF = lambda bitstr : f[rep.to_num(bitstr)]
-
-    b = rep.num_bits()
-
-    P = np.zeros((len(states), len(states)))
-    for i in range(len(states)):
-        state = states[i]
-        rowsum = 0
-        for neighb in rep.get_neighbors(state):
-            j = states.index(neighb)
-            if getF(neighb) > getF(state):
-                P[i][j]= 1/len(state)
-                rowsum += 1/len(state)
-        assert(rowsum <= 1)
-        P[i][i] = 1 - rowsum
-    return [P,states.index(rep.to_bitstr(a))]      
-
-
-
-def initTmatTemperature(rep, a, T = 50):
-    """
-    generates a numpy array (transition matrix) for 
-    representtation rep and given a value. The nature of this MC
-    is that a is an absorbing state. 
-
-    This is with temperature
-
-    returns the Transition matrix P and the index g of the global maxima
-    Returns [P,g]
-    """
-
-
-    assert(a < 2**rep.num_bits())
-    states = list(rep.get_rep().keys())
-    xmax = 2**rep.num_bits() -1
-    f = [xmax - abs(x - a) for x in range(0,xmax+1)]
-    getF = lambda bitstr : f[rep.to_num(bitstr)]
-
-    b = rep.num_bits()
-
-    P = np.zeros((len(states), len(states)))
-    for i in range(len(states)):
-        state = states[i]
-        rowsum = 0
-        for neighb in rep.get_neighbors(state):
-            j = states.index(neighb)
-            if getF(neighb) > getF(state):
-                P[i][j]= 1/len(state)
-                rowsum += 1/len(state)
-            else:
-                p = math.exp((getF(neighb)-getF(state))/T)/len(state)
-                P[i][j] = p
-                rowsum += p
-        assert(rowsum <= 1)
-        P[i][i] = 1 - rowsum
-
-    return [P,states.index(rep.to_bitstr(a))] 
-
-
-def theoreticalProbability(P, g, alpha = None, n = 10000000):
-    """
-    Using MC theory, calculates the proportion of subproblems solved for a given fitness function 
-    and representation without temperature. This is for a population size of 1.
-    Assumes uniform initial distribution (as in the experiment) and takes large
-    matrix powers to approximate long term behaviour. 
-
-    All local maxima are absorbing, so our end goal is to find the long term probability of the chain being 
-    absorbed in the global optima and not any of the local optima. 
-
-    Specifically, this function returns
-
-    \alpha \dot P^{n}_{*g} 
-
-    where \alpha is the uniform initial distribution, \dot is dot product, P is the transition matrix, and
-    P_{*g} denotes the gth column of P where g is the index coresponding to the global maxima 
-    """
-
-    if alpha is None:
-        alpha = [1/len(P)]*(len(P))
-
-
-    Pn = np.linalg.matrix_power(P,n)
-    prob = 0
-    for i in range(len(P)):
-        prob += alpha[i]*Pn[i][g]
-
-    # long term distribution
-    # print("Long term distribution")
-    # print(np.dot(np.array(alpha), Pn)) 
-
-    return prob
-
-
-def theoreticalProbabilityWithTemp(rep, a, alpha = None, n = 10000):
-    """
-    Here we perform matrix multiplication Pg = P1*P2*...*Pn where
-    Pi is the transition matrix for the nonhomogenous markov chain
-    at time i. The dot product
-
-    \alpha \dot P^{g}_{*g} 
-
-    is the value that is returned. 
-    """
-    if alpha is None:
-        alpha = [1/2**rep.num_bits()]*(2**rep.num_bits())
-
-    T_0 = 50
-    coolRate = 0.995
-    currP,g = initTmatTemperature(rep, a, T_0)
-
-    for i in range(n):
-        currP = np.matmul(currP, initTmatTemperature(rep,a,T_0*(coolRate)**i)[0])
-
-    # # long term distribution
-    # print("Long term distribution")
-    # print(np.dot(np.array(alpha), currP))
-
-    prob = 0
-    for i in range(len(currP)):
-        prob += alpha[i]*currP[i][g]
-
-    return prob
-#####
-
-def main(rep, a):
-    print("Probabilities...")
-    print()
-    prob = theoreticalProbabilityWithTemp(rep, a)
-    print("With temperature", prob) # with temp
-    print()
-    P,g = buildTmat(rep,a)
-    prob = theoreticalProbability(P,g)
-    print("Without temperature", prob) #without temp
-
-
-
-
+"""
+A Theoretical Markov chain model of the Simulated Annealing experiment.
+Doesn't simulate the chain -- it computes theoretical long term probabilities of finding the global maxima
+with temperature and non-temperature versions of the SA.
+"""
+
+
+"""
+Long term Markov chain probability
+"""
+
+import numpy as np
+from numba import njit
+from scipy.sparse import csr_matrix
+from representation import *
+import math
+import random
+
+
+@njit(cache=True)
+def build_tmat(fvec, b, T):
+    """
+    JIT kernel for the transition matrix build. States are the integer
+    genotypes 0..2**b-1, so the hamming neighbors of state i are i ^ (1<<k)
+    and no list.index search is needed. fvec[i] is the fitness of genotype i.
+    T <= 0 means no temperature, i.e. worse moves are rejected outright.
+    """
+    N = 1 << b
+    P = np.zeros((N, N))
+    m = 1.0/b
+    for i in range(N):
+        rowsum = 0.0
+        for k in range(b):
+            j = i ^ (1 << k)
+            if fvec[j] > fvec[i]:
+                P[i, j] = m
+                rowsum += m
+            elif T > 0:
+                p = math.exp((fvec[j] - fvec[i])/T)*m
+                P[i, j] = p
+                rowsum += p
+        P[i, i] = 1 - rowsum
+    return P
+
+
+def fitnessByGenotype(rep, a):
+    """
+    fitness LUT indexed by integer genotype: entry s is the fitness of the
+    bitstring whose integer value is s
+    """
+    xmax = 2**rep.num_bits() - 1
+    fvec = np.empty(xmax + 1)
+    for bitstr, num in rep.get_rep().items():
+        fvec[int(bitstr, 2)] = xmax - abs(num - a)
+    return fvec
+
+
+def precomputeNeighborhood(rep, a):
+    """
+    neighbor-index and fitness-difference tables shared by every step of a
+    cooling schedule: neighbors[i,k] = i ^ (1<<k) and
+    df[i,k] = fitness(neighbors[i,k]) - fitness(i). Only the temperature
+    varies across steps, so everything else is built once here.
+    """
+    b = rep.num_bits()
+    fvec = fitnessByGenotype(rep, a)
+    neighbors = np.arange(1 << b)[:, None] ^ (1 << np.arange(b))[None, :]
+    df = fvec[neighbors] - fvec[:, None]
+    return neighbors, df
+
+
+def assembleTmat(neighbors, df, T):
+    """
+    transition matrix at temperature T from the precomputed tables -- the
+    per-step cost is one vectorized exp over the (N, b) df table plus a
+    scatter into P. T <= 0 means no temperature.
+    """
+    N, b = df.shape
+    if T > 0:
+        accept = np.where(df > 0, 1.0/b, np.exp(df/T)/b)
+    else:
+        accept = np.where(df > 0, 1.0/b, 0.0)
+    P = np.zeros((N, N))
+    P[np.arange(N)[:, None], neighbors] = accept
+    P[np.arange(N), np.arange(N)] = 1 - accept.sum(axis=1)
+    return P
+
+
+def assembleTmatSparse(neighbors, df, T):
+    """
+    CSR version of assembleTmat. Each state has only its b hamming
+    neighbors plus the diagonal as nonzeros, so the matrix holds O(N b)
+    entries instead of a dense N^2 array, and v @ P costs O(N b). Used in
+    the cooling chain, which only ever applies P to a row vector.
+    """
+    N, b = df.shape
+    if T > 0:
+        accept = np.where(df > 0, 1.0/b, np.exp(df/T)/b)
+    else:
+        accept = np.where(df > 0, 1.0/b, 0.0)
+    rows = np.concatenate((np.repeat(np.arange(N), b), np.arange(N)))
+    cols = np.concatenate((neighbors.ravel(), np.arange(N)))
+    data = np.concatenate((accept.ravel(), 1 - accept.sum(axis=1)))
+    return csr_matrix((data, (rows, cols)), shape=(N, N))
+
+
+def buildTmat(rep, a):
+    """
+    generates a numpy array (transition matrix) for
+    representtation rep and given a value. The nature of this MC
+    is that a is an absorbing state.
+
+    This is without temperature
+
+    returns the Transition matrix P and the index g of the global maxima
+    Returns [P,g]
+
+    States are indexed by the integer value of their bitstring (a relabeling
+    of the old rep-order indexing; the uniform-alpha probabilities are
+    unaffected).
+    """
+    assert(a < 2**rep.num_bits())
+    P = build_tmat(fitnessByGenotype(rep, a), rep.num_bits(), 0.0)
+    return [P, int(rep.to_bitstr(a), 2)]
+
+
+
+def initTmatTemperature(rep, a, T = 50):
+    """
+    generates a numpy array (transition matrix) for
+    representtation rep and given a value. The nature of this MC
+    is that a is an absorbing state.
+
+    This is with temperature
+
+    returns the Transition matrix P and the index g of the global maxima
+    Returns [P,g]
+
+    States are indexed by the integer value of their bitstring, as in
+    buildTmat.
+    """
+    assert(a < 2**rep.num_bits())
+    P = build_tmat(fitnessByGenotype(rep, a), rep.num_bits(), float(T))
+    return [P, int(rep.to_bitstr(a), 2)]
+
+
+def theoreticalProbability(P, g, alpha = None, n = 10000000):
+    """
+    Using MC theory, calculates the proportion of subproblems solved for a given fitness function 
+    and representation without temperature. This is for a population size of 1.
+    Assumes uniform initial distribution (as in the experiment) and takes large
+    matrix powers to approximate long term behaviour. 
+
+    All local maxima are absorbing, so our end goal is to find the long term probability of the chain being 
+    absorbed in the global optima and not any of the local optima. 
+
+    Specifically, this function returns
+
+    \alpha \dot P^{n}_{*g} 
+
+    where \alpha is the uniform initial distribution, \dot is dot product, P is the transition matrix, and
+    P_{*g} denotes the gth column of P where g is the index coresponding to the global maxima 
+    """
+
+    if alpha is None:
+        alpha = [1/len(P)]*(len(P))
+
+
+    Pn = matrixPowerConverged(P,n)
+    prob = np.dot(alpha, Pn[:,g])
+
+    # long term distribution
+    # print("Long term distribution")
+    # print(np.dot(np.array(alpha), Pn))
+
+    return prob
+
+
+def matrixPowerConverged(P, n, tol = 1e-12):
+    """
+    Computes P^n by binary exponentiation (repeated squaring), bailing out
+    early once squaring no longer changes the matrix. The chain is
+    absorbing so P^k converges geometrically and most of the multiplies
+    in np.linalg.matrix_power are wasted.
+    """
+    result = np.eye(len(P))
+    base = P.copy()
+    while n:
+        if n & 1:
+            result = result @ base
+        nxt = base @ base
+        if np.max(np.abs(nxt - base)) < tol:
+            # base has reached its limit; all remaining factors are equal to it
+            result = result @ nxt
+            break
+        base = nxt
+        n >>= 1
+    return result
+
+
+def theoreticalProbabilityWithTemp(rep, a, alpha = None, n = 10000):
+    """
+    Here we perform matrix multiplication Pg = P1*P2*...*Pn where
+    Pi is the transition matrix for the nonhomogenous markov chain
+    at time i. The dot product
+
+    \alpha \dot P^{g}_{*g} 
+
+    is the value that is returned. 
+    """
+    if alpha is None:
+        alpha = [1/2**rep.num_bits()]*(2**rep.num_bits())
+
+    T_0 = 50
+    coolRate = 0.995
+    neighbors, df = precomputeNeighborhood(rep, a)
+    g = int(rep.to_bitstr(a), 2)
+
+    # only alpha . P1 P2 ... Pn is needed, so carry the row vector through
+    # the chain (n matrix-vector products) instead of accumulating the full
+    # matrix product (n N^3 matmuls)
+    v = np.asarray(alpha, dtype=np.float64) @ assembleTmatSparse(neighbors, df, T_0)
+    for i in range(n):
+        v = v @ assembleTmatSparse(neighbors, df, T_0*(coolRate)**i)
+
+    return v[g]
+#####
+
+def main(rep, a):
+    print("Probabilities...")
+    print()
+    prob = theoreticalProbabilityWithTemp(rep, a)
+    print("With temperature", prob) # with temp
+    print()
+    P,g = buildTmat(rep,a)
+    prob = theoreticalProbability(P,g)
+    print("Without temperature", prob) #without temp
+
+
+
+
@@ -8,8 +8,8 @@ Runs with the same optimizing function but different encodings will be shown on
 to see how different encodings compare
 """
 
-import matplotlib.pyplot as plt 
-import statistics as st
+import numpy as np
+import os
 
 
 class Graph:
@@ -60,6 +60,13 @@ def plot(graphs, title, x_axis, y_axis, fig, scatter = False):
     fig -- figure number
     scatter -- whether points should be connected (False) or not (True)
     """
+    # matplotlib is imported here rather than at module level so the GA
+    # workers, which only need Graph/average_graph, don't pay the pyplot
+    # import cost. Agg keeps it headless.
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
     plt.figure(fig)
     for g in graphs:
         xs = g.get_Xs()
@@ -74,7 +81,8 @@ def plot(graphs, title, x_axis, y_axis, fig, scatter = False):
     plt.locator_params(axis='x', nbins=4)  # 4 ticks on x-axis
     plt.title(title)
     plt.legend()
-    filename = "graphs" + "\\" + ''.join((title.split(' '))) + ".png"
+    os.makedirs("graphs", exist_ok=True)
+    filename = os.path.join("graphs", ''.join(title.split(' ')) + ".png")
     print("Output graph to " + filename)
     plt.savefig(filename)
 
@@ -85,16 +93,18 @@ def parse(fname):
     Grabs data from text file fname.txt 
     Returns a Graph object containing said data
     """
-    f = open("output" + "\\" + fname + '.txt', 'r')
-    l = list(f)
-    newg = Graph(l[3])
-    for line in l[5:]:
-        s = line.split('\n')[0]
-        s = s.split('\t')
-        try:
-            newg.add_point((int(s[0]), float(s[1])))
-        except ValueError:
-            break
+    path = os.path.join("output", fname + '.txt')
+    with open(path, 'r') as f:
+        label = f.readlines()[3]
+    # bulk-parse the tab-separated (gen, fitness) rows in one C loop instead
+    # of a Python int/float conversion per line. Malformed rows are skipped
+    # or parsed as nan and dropped (the old loop just stopped at the first).
+    data = np.genfromtxt(path, skip_header=5, delimiter='\t', invalid_raise=False)
+    data = data.reshape(-1, 2)
+    data = data[~np.isnan(data).any(axis=1)]
+    newg = Graph(label)
+    newg.set_Xs(data[:, 0].astype(int).tolist())
+    newg.set_Ys(data[:, 1].tolist())
     return newg
 
 def average_graph(objs, label):
@@ -113,16 +123,12 @@ def average_graph(objs, label):
 
     assert [len(graph) for graph in graphs] == [len(graphs[0])]*len(graphs), "cannot average over graphs with different lengths"
 
-    avg_graph = Graph(label)    
+    avg_graph = Graph(label)
     # x-axis should be same across all graphs (the generation count)
     avg_graph.set_Xs(graphs[0].get_Xs())
-    avg_Ys = []
-    for i in range(0, len(graphs[0].get_Ys())):
-        entry_avg = []
-        for graph in graphs:
-            entry_avg.append(graph.get_Ys()[i])
-        avg_Ys.append(st.mean(entry_avg))
-    avg_graph.set_Ys(avg_Ys)
+    # stack the trials into a (trials, gens) matrix and reduce once
+    ys = np.asarray([graph.get_Ys() for graph in graphs], dtype=np.float64)
+    avg_graph.set_Ys(ys.mean(axis=0).tolist())
     return avg_graph
 
 def visualize(objs, graphTitle, fig):
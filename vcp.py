@@ -12,116 +12,241 @@ where for each t only one individual g(t)_1 was checked for optimality. Thus for
 have a series of 1000 Bernoulli trials. 
 """
 
-import random
-import matplotlib.pyplot as plt
+import functools
+import multiprocessing as mp
+import os
+import numpy as np
+from numba import njit, prange
 # G_d is a graph of d disconnected triangle subgraphs
 # Represent G_d as list of undirected edges in [u,v] notation
 # This ensures the edges are ordered
 
+@functools.lru_cache(maxsize=None)
 def generate_G(d):
     """
     Generates a graph consisting of d disconnected triangle subgraphs
-    using the above representation. 
+    using the above representation. Memoized and returned as an immutable
+    tuple of edges, so the thousands of trials of one experiment share a
+    single graph instead of rebuilding it per VCP instance.
     """
     graph = []
     for n in range(0, 3*d, 3):
-        graph.append([n,n+1])
-        graph.append([n,n+2])
-        graph.append([n+2,n+1])
-    return graph        
+        graph.append((n,n+1))
+        graph.append((n,n+2))
+        graph.append((n+2,n+1))
+    return tuple(graph)
+
+
+# per-d edge arrays derived from generate_G, shared by every VCP instance
+_EDGE_ARRAYS = {}
+
+
+def _edge_arrays(d):
+    """
+    the (E, 2) int32 edge matrix and its flat per-bit-value columns,
+    built once per d so repeated trials reuse the same (cache-hot) arrays
+    """
+    if d not in _EDGE_ARRAYS:
+        Garr = np.array(generate_G(d), dtype=np.int32)
+        _EDGE_ARRAYS[d] = (Garr, Garr[:, 0].copy(), Garr[:, 1].copy())
+    return _EDGE_ARRAYS[d]
+
+
+def _opt3_patterns():
+    """
+    Every triangle has the same local edge structure, so which of the 8
+    possible 3-bit edge patterns cover exactly two distinct vertices is a
+    problem constant. Returns the bool mask over patterns, computed once
+    from a single-triangle graph.
+    """
+    G = generate_G(1)
+    opt3 = np.empty(8, dtype=np.bool_)
+    for p in range(8):
+        triangle = {G[i][(p >> i) & 1] for i in range(3)}
+        opt3[p] = len(triangle) == 2
+    return opt3
+
+
+OPT3 = _opt3_patterns()
+
+# packed per-d optimality tables, shared by every VCP instance
+_OPT_TABLES = {}
+
+
+def _opt_lookup(d):
+    """
+    Bit table over all 2**(3d) genotypes with bit g set iff genotype g is
+    an optimal cover, packed little-endian so a genotype indexes its own
+    bit. Optimality factorizes per triangle, so the table is a d-fold
+    product of the 8-pattern triangle mask OPT3; it costs 2**(3d-3)
+    bytes -- 2 MiB at d = 8 -- and is built once per d.
+    """
+    if d not in _OPT_TABLES:
+        tab = OPT3
+        for _ in range(d - 1):
+            # prepend one triangle: index (pat << 3k) | rest
+            tab = (OPT3[:, None] & tab[None, :]).ravel()
+        _OPT_TABLES[d] = np.packbits(tab, bitorder='little')
+    return _OPT_TABLES[d]
+
+
+@njit(parallel=True, cache=True)
+def _fitness_kernel(P, G0, G1, V, E):
+    """
+    JIT kernel behind VCP.fitness_pop: per-individual distinct-vertex count
+    over the packed genotypes, parallel across the population
+    """
+    N = P.size
+    F = np.empty(N, dtype=np.int64)
+    for i in prange(N):
+        g = P[i]
+        seen = np.zeros(V, dtype=np.bool_)
+        cnt = 0
+        for k in range(E):
+            if (g >> np.uint64(k)) & np.uint64(1):
+                v = G1[k]
+            else:
+                v = G0[k]
+            if not seen[v]:
+                seen[v] = True
+                cnt += 1
+        F[i] = V - cnt
+    return F
+
+
+@njit(cache=True)
+def _step_kernel(pop, F, s, nflips, E, rng):
+    """
+    Fused compiled generation step: the N tournaments, the winner copies
+    and the scatter of nflips mutation bit flips run in one pass with no
+    intermediate arrays. Draws come from the caller's Generator, whose
+    state is shared between compiled and Python code.
+    """
+    N = pop.size
+    new = np.empty_like(pop)
+    for i in range(N):
+        best = rng.integers(0, N)
+        for _ in range(s - 1):
+            c = rng.integers(0, N)
+            if F[c] > F[best]:
+                best = c
+        new[i] = pop[best]
+    for _ in range(nflips):
+        r = rng.integers(0, N)
+        b = rng.integers(0, E)
+        new[r] ^= np.uint64(1) << np.uint64(b)
+    return new
 
 
 class VCP:
-    def __init__(self, d):
+    def __init__(self, d, seed=None):
         """
         d : number of disconnected triangle subgraphs to cover
+        seed : optional RNG seed, so trials farmed out to worker processes
+               are reproducible and decorrelated
         """
-        self.G = generate_G(d) 
+        # one PCG64 generator per instance; every random draw in the run
+        # loop comes from it in bulk
+        self.rng = np.random.default_rng(seed)
+        self.G = generate_G(d)
         self.E = 3*d
         self.V = 3*d
+        # edge list as an (E, 2) array, split into flat per-bit-value columns
+        # so whole-population fitness is a branchless select on contiguous
+        # arrays rather than a 2D gather; shared across instances of the
+        # same d
+        self.Garr, self.G0, self.G1 = _edge_arrays(d)
+        # genotypes are packed into one uint64 each (bit i is edge i)
+        assert self.E <= 64, "packed genotypes hold at most 64 edge bits (d <= 21)"
+        # for small instances the whole optimality predicate fits in a bit
+        # table indexed by the packed genotype
+        self.opt_table = _opt_lookup(d) if self.E <= 24 else None
 
     def fitness(self, genotype):
         """
-        Returns fitness value of input genotype. 
-        V - x(genotype) 
+        Returns fitness value of input genotype (a packed uint64).
+        V - x(genotype)
         where x(genotype) is the number of vertices covered by the genotype
 
         Bigger number is better
         """
-        assert(len(genotype) == self.E)
-        vertices = set()
-        for i in range(len(genotype)):
-            vertices.add(self.G[i][int(genotype[i])])
+        return int(self.fitness_pop(np.array([genotype], dtype=np.uint64))[0])
 
-        return self.V - len(vertices)
+    def fitness_pop(self, P):
+        """
+        Fitness of every packed genotype in P at once, via the compiled
+        kernel (parallel across individuals).
+        """
+        return _fitness_kernel(P, self.G0, self.G1, self.V, self.E)
 
     def tournament_selection(self, s):
         """
-        s tournament selection.
-        Chooses s individuals, uniformly randomly, from current population.
-        Returns the individual with the best fitness 
+        s tournament selection, one tournament per population slot, all N
+        drawn at once. Each tournament samples min(s, N) contestant indices,
+        and the winner is the contestant with the best cached fitness -- an
+        argmax over the gathered fitness rows. Returns the length-N vector
+        of winning packed genotypes.
+
+        The common small tournaments are special-cased: s = 1 is a plain
+        uniform draw, and s = 2 is a pairwise where-select (ties go to the
+        first contestant, like argmax).
         """
-        return max(random.sample(self.pop, k=min(s,self.N)), key = self.fitness)
+        k = min(s, self.N)
+        if k == 1:
+            winners = self.rng.integers(0, self.N, self.N)
+        elif k == 2:
+            i = self.rng.integers(0, self.N, self.N)
+            j = self.rng.integers(0, self.N, self.N)
+            winners = np.where(self.F[i] >= self.F[j], i, j)
+        else:
+            idx = self.rng.integers(0, self.N, size=(self.N, k))
+            winners = idx[np.arange(self.N), self.F[idx].argmax(axis=1)]
+        return self.pop[winners]
 
     def mutate(self, indiv, pm):
         """
-        returns a new individual that has been mutated
+        returns a new mutated copy of a vector of packed genotypes
         pm : mutation rate
         """
-        flip = lambda b : '0' if b == '1' else '1'
-        newb = ''
-        for i in range(len(indiv)):
-            if random.uniform(0,1) < pm: 
-                newb += flip(indiv[i])
-            else:
-                newb += indiv[i]
-
-        assert(len(newb) == len(indiv))
-        return newb
+        # draw only the total number of flips (binomial over all bits of all
+        # individuals) and scatter-XOR them onto random (row, bit) positions,
+        # so the RNG work scales with the expected flips instead of N*E
+        new = indiv.copy()
+        k = self.rng.binomial(indiv.size*self.E, pm)
+        rows = self.rng.integers(0, indiv.size, k)
+        bits = self.rng.integers(0, self.E, k, dtype=np.uint64)
+        np.bitwise_xor.at(new, rows, np.uint64(1) << bits)
+        return new
+
+    def _optimal_mask(self, P):
+        """
+        Bool mask over the packed genotypes in P: True where every triangle
+        subgraph is covered by exactly two distinct vertices. Small
+        instances answer with one bit probe into the precomputed table;
+        larger ones slice out the 3-bit pattern of each triangle and test
+        it against the OPT3 pattern mask -- pure integer arithmetic, no
+        set construction.
+        """
+        if self.opt_table is not None:
+            byte = self.opt_table[(P >> np.uint64(3)).astype(np.intp)]
+            return ((byte >> (P & np.uint64(7)).astype(np.uint8)) & 1).astype(np.bool_)
+        shifts = np.uint64(3)*np.arange(self.E//3, dtype=np.uint64)
+        pats = (P[:, None] >> shifts) & np.uint64(7)
+        return OPT3[pats.astype(np.intp)].all(axis=1)
 
     def proportion_of_opt_sols(self):
         """
         Computes and returns the proportion of optimal genotypes in the current population
 
-        optimal solution is one where every triangle subgraph is covered by exactly two edges  
+        optimal solution is one where every triangle subgraph is covered by exactly two edges
         """
-        count = 0
-        for indiv in self.pop:
-            #check each triangle individually. Each triangle needs to be optimal for the entire cover to be optimal
-            for i in range(0,len(indiv),3):
-                flag = True
-                triangle = set()
-                triangle.add(self.G[i][int(indiv[i])])
-                triangle.add(self.G[i+1][int(indiv[i+1])])
-                triangle.add(self.G[i+2][int(indiv[i+2])])
-
-                if len(triangle) != 2:
-                    flag = False
-                    break
-
-            count += int(flag)
-
-        return count/len(self.pop)
+        return self._optimal_mask(self.pop).mean()
 
     def one_indiv_optimal(self):
         """
-        Returns True if the first individual in population is optimal. else false. 
+        Returns True if the first individual in population is optimal. else false.
         """
-        indiv = self.pop[0]
- 
-        #check each triangle individually. Each triangle needs to be optimal for the entire cover to be optimal
-        for i in range(0,len(indiv),3):
-            flag = True
-            triangle = set()
-            triangle.add(self.G[i][int(indiv[i])])
-            triangle.add(self.G[i+1][int(indiv[i+1])])
-            triangle.add(self.G[i+2][int(indiv[i+2])])
-
-            if len(triangle) != 2:
-                flag = False
-                break
-
-        return flag
+        return bool(self._optimal_mask(self.pop[:1])[0])
 
 
 
@@ -145,16 +270,38 @@ class VCP:
         self.data = []
 
         # initial population is one where every triangle subgraoh is covered redunantly, as determined in Eremeev (1999)
-        # This means every node is in the vertex cover, which is a genotype of '011' for each triangle subgraph
-        self.pop = ['011'*(self.E//3)]*self.N 
+        # This means every node is in the vertex cover, which is a genotype of 011 for each triangle subgraph
+        # (edges 3t+1 and 3t+2 set, i.e. packed bits 0b110 per triangle).
+        # The population is held as a length-N vector of packed uint64 genotypes.
+        init = sum(6 << (3*t) for t in range(self.E//3))
+        self.pop = np.full(self.N, init, dtype=np.uint64)
+
+        if N == 1:
+            # with a single individual every tournament returns it, so the
+            # chain is mutate-only -- skip fitness evaluation and selection
+            # entirely (this is the 1999 N=1 curve and most of the 2018
+            # Bernoulli runs)
+            for t in range(tmax):
+                self.pop = self.mutate(self.pop, pm)
+                opt = self.one_indiv_optimal()
+                self.data.append(opt if bernoulli else float(opt))
+            return self.data
 
         for t in range(tmax):
-            self.newpop = []
-            for k in range(N):
-                g = self.tournament_selection(s)
-                self.newpop.append(self.mutate(g,pm))
-            assert(len(self.newpop) == len(self.pop))
-            self.pop = self.newpop.copy()
+            # every tournament this generation reads from one batched
+            # fitness evaluation instead of recomputing per participant,
+            # and the winners are mutated as one matrix. Selection keeps
+            # the population near-monoclonal (the first generation is fully
+            # so), so evaluate each distinct genotype once and broadcast
+            # back through the inverse index.
+            uniq, inv = np.unique(self.pop, return_inverse=True)
+            self.F = self.fitness_pop(uniq)[inv]
+            # selection and mutation run as one compiled pass over the
+            # population (the flip count is drawn here so the binomial
+            # stays on the Generator's Python side)
+            nflips = self.rng.binomial(N*self.E, pm)
+            self.pop = _step_kernel(self.pop, self.F, min(s, N), nflips,
+                                    self.E, self.rng)
             if bernoulli:
                 self.data.append(self.one_indiv_optimal())
             else:
@@ -174,6 +321,13 @@ def vcp_plot(datas, labels, title, x_axis, y_axis, fname, scatter = False):
     """
     assert(len(datas) == len(labels))
 
+    # matplotlib is imported here rather than at module level so the pool
+    # workers, which only run trials, don't pay the pyplot import cost.
+    # Agg keeps it headless.
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
     for i in range(len(datas)):
         data = datas[i]
         xs = list(range(len(data)))
@@ -191,11 +345,22 @@ def vcp_plot(datas, labels, title, x_axis, y_axis, fname, scatter = False):
     plt.locator_params(axis='x', nbins=4)  # 4 ticks on x-axis
     plt.title(title)
     plt.legend()
-    filename = "graphs" + "\\" + fname + ".png"
+    os.makedirs("graphs", exist_ok=True)
+    filename = os.path.join("graphs", fname + ".png")
     print("Output graph to " + filename)
     plt.savefig(filename)
 
 
+def _one_trial(args):
+    """
+    Top-level worker for the trial pool: runs one independent VCP EA with
+    its own RNG seed and returns the data series as an array.
+    """
+    d, tmax, s, pm, N, bernoulli, seed = args
+    problem = VCP(d, seed=seed)
+    return np.asarray(problem.run(tmax, s, pm, N, bernoulli), dtype=np.float64)
+
+
 def average_over(A, d, tmax, s, pm, N, bernoulli = False):
     """
     Runs the VCP EA A times and returns a list L where L[i] is the average proportion of optimal solutions at the ith iteration)
@@ -203,15 +368,17 @@ def average_over(A, d, tmax, s, pm, N, bernoulli = False):
     Other parameters are as they are above, documented in VCP.run
 
     it prints the data at the end. So if you don't want to run the algorithm again, just copy the printed out data and paste it somewhere
-    to graph later. 
+    to graph later.
     """
-    average_data = [0]*tmax
-    for i in range(A):
-        problem = VCP(d)
-        data = problem.run(tmax, s, pm, N, bernoulli)
-        average_data = [average_data[i] + data[i] for i in range(len(data))]
-        print(i)
-    average_data = list(map(lambda x : x/A, average_data))
+    # the A trials are fully independent, so farm them out one per core;
+    # each gets its own SeedSequence child for reproducibility and
+    # statistically independent streams
+    seeds = np.random.SeedSequence(0).spawn(A)
+    jobs = [(d, tmax, s, pm, N, bernoulli, seed) for seed in seeds]
+    with mp.Pool() as pool:
+        results = list(pool.imap_unordered(_one_trial, jobs,
+                                           chunksize=max(1, A//(4*os.cpu_count()))))
+    average_data = (np.add.reduce(results)/A).tolist()
     print(average_data)
     return average_data
 